@@ -1,93 +1,232 @@
 from abc import ABC, abstractmethod
-from typing import List, Any, Optional
+from typing import Callable, List, Any, Optional, Tuple
+from collections import OrderedDict
+import functools
+import hashlib
+import os
+import threading
 import pkg_resources
+import numpy as np
+from spacy.attrs import DEP, HEAD, IS_ALPHA, IS_PUNCT, LIKE_EMAIL, LIKE_URL, POS
+from spacy.matcher import PhraseMatcher
+from spacy.symbols import DET, NOUN, PROPN, VERB
+from spacy.tokens import Doc
 from symspellpy import SymSpell, Verbosity
+from symspellpy.helpers import case_transfer_similar
+from symspellpy.editdistance import DistanceAlgorithm, EditDistance
 import language_tool_python
 import textstat
 import logging
 
-from schemas import DetectionResult, ErrorType, ReadabilityMetrics
+from schemas import Detection, ErrorType, ReadabilityMetrics
+from spacy_provider import CACHE_DIR, atomic_write
 
 logger = logging.getLogger(__name__)
 
+@functools.lru_cache(maxsize=10_000)
+def _intern(message: str) -> str:
+    """
+    Return one shared copy of `message`, so detections repeating the same text
+    (every occurrence of a misspelling, LanguageTool's stock messages) don't each
+    hold their own string. Bounded, unlike sys.intern, since messages embed user text.
+    """
+    return message
+
 class BaseDetector(ABC):
     @abstractmethod
-    def detect(self, text: str, doc: Optional[Any] = None) -> List[DetectionResult]:
+    def detect(self, text: str, doc: Optional[Any] = None) -> List[Detection]:
         """
         Run detection on the given text/doc.
         """
         pass
 
-class SpellingDetector(BaseDetector):
+class TokenDetector(BaseDetector):
+    """
+    A detector expressed as hooks over a parsed doc instead of owning its own
+    loops, so several detectors can share one walk (see run_token_detectors).
+    Each hook reports findings through `emit(detection)`.
+    """
+    def on_doc(self, doc: Any, text: str, emit: Callable[[Detection], None]) -> None:
+        """
+        Whole-doc work that isn't per-token (e.g. phrase matching).
+        """
+        pass
+
+    def on_token(self, token: Any, emit: Callable[[Detection], None]) -> None:
+        pass
+
+    def on_sent(self, sent: Any, emit: Callable[[Detection], None]) -> None:
+        pass
+
+    def detect(self, text: str, doc: Optional[Any] = None) -> List[Detection]:
+        if not doc:
+            return []
+        return run_token_detectors([self], text, doc)
+
+def run_token_detectors(detectors: List[TokenDetector], text: str, doc: Any) -> List[Detection]:
+    """
+    Run several TokenDetectors over `doc` with a single pass over its tokens
+    (and one over its sentences) instead of one pass per detector.
+    """
+    results = []
+    emit = results.append
+
+    for detector in detectors:
+        detector.on_doc(doc, text, emit)
+
+    # Only call hooks a detector actually overrides.
+    token_hooks = [d.on_token for d in detectors if type(d).on_token is not TokenDetector.on_token]
+    sent_hooks = [d.on_sent for d in detectors if type(d).on_sent is not TokenDetector.on_sent]
+
+    if token_hooks:
+        for token in doc:
+            for hook in token_hooks:
+                hook(token, emit)
+
+    if sent_hooks:
+        for sent in doc.sents:
+            for hook in sent_hooks:
+                hook(sent, emit)
+
+    return results
+
+class SpellingDetector(TokenDetector):
+    MAX_EDIT_DISTANCE = 2
+    PREFIX_LENGTH = 7
+    # Token attributes the candidate filter reads, in column order (see on_doc).
+    FILTER_ATTRS = [IS_ALPHA, LIKE_URL, LIKE_EMAIL, POS, IS_PUNCT]
+
     def __init__(self):
         # Initialize SymSpell
-        self.sym_spell = SymSpell(max_dictionary_edit_distance=2, prefix_length=7)
+        # Candidate scoring is the hot loop, so pin the native (editdistpy) Damerau-OSA
+        # comparer; newer symspellpy releases default to a pure-Python implementation
+        # and only pull in editdistpy as an extra, hence the direct dependency.
+        self.sym_spell = SymSpell(
+            max_dictionary_edit_distance=self.MAX_EDIT_DISTANCE,
+            prefix_length=self.PREFIX_LENGTH,
+            distance_comparer=EditDistance(DistanceAlgorithm.DAMERAU_OSA_FAST),
+        )
         
-        # Load default dictionary provided by symspellpy
-        # Fallback handling might be needed if pkg_resources fails, but it's standard.
+        # Building the deletes structure from the frequency file takes seconds, so
+        # it is pickled on first run and reloaded from there afterwards.
+        # Settings are part of the file name since the pickle bakes them in.
+        pickle_path = os.path.join(
+            CACHE_DIR, f"symspell_82k_d{self.MAX_EDIT_DISTANCE}_p{self.PREFIX_LENGTH}.pkl"
+        )
+        if not self._load_pickle(pickle_path):
+            # Load default dictionary provided by symspellpy
+            # Fallback handling might be needed if pkg_resources fails, but it's standard.
+            try:
+                dictionary_path = pkg_resources.resource_filename(
+                    "symspellpy", "frequency_dictionary_en_82_765.txt"
+                )
+                if self.sym_spell.load_dictionary(dictionary_path, term_index=0, count_index=1):
+                    self._save_pickle(pickle_path)
+            except Exception as e:
+                # If resource loading fails, we might need a local fallback or error out
+                print(f"Error loading SymSpell dictionary: {e}")
+                pass
+
+        # Lookups are pure for a loaded dictionary, so memoize them per word.
+        # The verdict is keyed on the lowercased word so every case variant shares
+        # one SymSpell lookup; the cased suggestions are then memoized per surface form.
+        # Together they make each distinct word cost one lookup, across tokens and documents.
+        self._misspelling_suggestions = functools.lru_cache(maxsize=100_000)(self._misspelling_suggestions)
+        self._cased_suggestions = functools.lru_cache(maxsize=100_000)(self._cased_suggestions)
+
+    def _load_pickle(self, path: str) -> bool:
+        if not os.path.exists(path):
+            return False
         try:
-            dictionary_path = pkg_resources.resource_filename(
-                "symspellpy", "frequency_dictionary_en_82_765.txt"
-            )
-            self.sym_spell.load_dictionary(dictionary_path, term_index=0, count_index=1)
+            return self.sym_spell.load_pickle(path)
         except Exception as e:
-            # If resource loading fails, we might need a local fallback or error out
-            print(f"Error loading SymSpell dictionary: {e}")
-            pass
+            # Corrupt/incompatible pickle: fall back to the text dictionary (and overwrite it).
+            logger.warning(f"Ignoring unreadable SymSpell pickle {path}: {e}")
+            return False
 
-    def detect(self, text: str, doc: Optional[Any] = None) -> List[DetectionResult]:
-        if not doc:
-            return []
+    def _save_pickle(self, path: str):
+        try:
+            atomic_write(path, self.sym_spell.save_pickle)
+        except Exception as e:
+            logger.warning(f"Could not cache SymSpell dictionary to {path}: {e}")
 
-        results = []
+    def _misspelling_suggestions(self, word_lower: str) -> Optional[Tuple[str, ...]]:
+        """
+        Return the top (lowercase) suggestions if `word_lower` looks misspelled, else None.
+        """
+        # SymSpell lookup
+        suggestions = self._lookup(word_lower)
         
-        for token in doc:
-            # Skip non-alpha, URLs, emails, or Proper Nouns
-            if (not token.is_alpha 
-                or token.like_url 
-                or token.like_email 
-                or token.pos_ == "PROPN"
-                or token.is_punct):
-                continue
-            
+        if not suggestions:
+            return None
+
+        # Check if the word itself is in the suggestions (exact match)
+        # If the best suggestion is the word itself (distance 0), it's correct.
+        # But sometimes valid words aren't in the dict. 
+        # SymSpell will return the word itself if it's in the dict.
+        
+        # Simple check: is the word in the dictionary? 
+        # Note: valid words might be missing. Over-correction risk.
+        
+        found_exact = False
+        top_suggestions = []
+        
+        for s in suggestions:
+            if s.term.lower() == word_lower:
+                found_exact = True
+            top_suggestions.append(s.term)
+        
+        if found_exact:
+            return None
+        
+        # If not found exact, treat as potential misspelling
+        # We take top 3 suggestions
+        return tuple(top_suggestions[:3])
+
+    def _cased_suggestions(self, word: str) -> Optional[Tuple[str, ...]]:
+        """
+        Suggestions for `word` with its casing restored, or None if it looks correct.
+        """
+        final_suggestions = self._misspelling_suggestions(word.lower())
+        if final_suggestions is None:
+            return None
+        # Equivalent to SymSpell's own transfer_casing=True.
+        return tuple(case_transfer_similar(word, term) for term in final_suggestions)
+
+    def _lookup(self, word_lower: str):
+        # No transfer_casing here: the caller re-applies each token's own casing,
+        # which is what lets every case variant share one lookup.
+        return tuple(self.sym_spell.lookup(
+            word_lower, 
+            Verbosity.CLOSEST, 
+            max_edit_distance=self.MAX_EDIT_DISTANCE
+        ))
+
+    def on_doc(self, doc: Any, text: str, emit: Callable[[Detection], None]) -> None:
+        if not len(doc):
+            return
+        # Skip non-alpha, URLs, emails, or Proper Nouns.
+        # One to_array call reads these flags for every token and numpy does the
+        # filtering, instead of five attribute lookups through a Token object each.
+        arr = doc.to_array(self.FILTER_ATTRS)
+        candidates = np.flatnonzero(
+            (arr[:, 0] == 1)        # is_alpha
+            & (arr[:, 1] == 0)      # like_url
+            & (arr[:, 2] == 0)      # like_email
+            & (arr[:, 3] != PROPN)  # pos_ == "PROPN"
+            & (arr[:, 4] == 0)      # is_punct
+        )
+
+        for i in candidates:
+            token = doc[int(i)]
             word = token.text
-            # SymSpell lookup
-            suggestions = self.sym_spell.lookup(
-                word, 
-                Verbosity.CLOSEST, 
-                max_edit_distance=2,
-                transfer_casing=True
-            )
-            
-            if not suggestions:
+            final_suggestions = self._cased_suggestions(word)
+            if final_suggestions is None:
                 continue
 
-            # Check if the word itself is in the suggestions (exact match)
-            # If the best suggestion is the word itself (distance 0), it's correct.
-            # But sometimes valid words aren't in the dict. 
-            # SymSpell will return the word itself if it's in the dict.
-            
-            # Simple check: is the word in the dictionary? 
-            # Note: valid words might be missing. Over-correction risk.
-            
-            found_exact = False
-            top_suggestions = []
-            
-            for s in suggestions:
-                if s.term.lower() == word.lower():
-                    found_exact = True
-                top_suggestions.append(s.term)
-            
-            if found_exact:
-                continue
-            
-            # If not found exact, treat as potential misspelling
-            # We take top 3 suggestions
-            final_suggestions = top_suggestions[:3]
-            
-            results.append(DetectionResult(
+            emit(Detection(
                 error_type=ErrorType.SPELLING,
-                message=f"Possible spelling error: '{word}'",
+                message=_intern(f"Possible spelling error: '{word}'"),
                 start_index=token.idx,
                 end_index=token.idx + len(word),
                 suggestions=final_suggestions,
@@ -95,30 +234,50 @@ class SpellingDetector(BaseDetector):
                 source="symspell"
             ))
 
-        return results
-
 class LanguageToolDetector(BaseDetector):
+    # Max number of distinct texts whose LT matches are kept in memory.
+    CACHE_SIZE = 256
+
     def __init__(self):
-        # Use public API to avoid 200MB+ download during demo
+        # Bounded LRU of {text hash: matches}; re-analysing unchanged text
+        # skips the HTTP round-trip entirely.
+        self._cache = OrderedDict()
+        self._cache_lock = threading.Lock()
+        # Use public API to avoid 200MB+ download during demo.
+        # The public API costs ~1-2s per check; production deploys should point
+        # LT_SERVER_URL at a self-hosted LanguageTool HTTP server (tens of ms).
         # For strict local/privacy usage, remove remote_server argument to download/use local Java server.
+        server_url = os.getenv("LT_SERVER_URL", "https://api.languagetool.org/")
         try:
-            self.tool = language_tool_python.LanguageTool('en-US', remote_server='https://api.languagetool.org/')
+            self.tool = language_tool_python.LanguageTool('en-US', remote_server=server_url)
         except Exception as e:
-            logger.error(f"Failed to connect to LanguageTool public API: {e}")
+            logger.error(f"Failed to connect to LanguageTool server at {server_url}: {e}")
             self.tool = None
 
-    def detect(self, text: str, doc: Optional[Any] = None) -> List[DetectionResult]:
+    def detect(self, text: str, doc: Optional[Any] = None) -> List[Detection]:
         if not self.tool:
             return []
         
         if not text or not text.strip():
             return []
         
-        try:
-            matches = self.tool.check(text)
-        except Exception as e:
-            logger.error(f"LanguageTool check failed: {e}")
-            return []
+        key = hashlib.blake2b(text.encode(), digest_size=16).hexdigest()
+        with self._cache_lock:
+            matches = self._cache.get(key)
+            if matches is not None:
+                self._cache.move_to_end(key)
+
+        if matches is None:
+            try:
+                matches = self.tool.check(text)
+            except Exception as e:
+                logger.error(f"LanguageTool check failed: {e}")
+                return []
+            with self._cache_lock:
+                self._cache[key] = matches
+                if len(self._cache) > self.CACHE_SIZE:
+                    self._cache.popitem(last=False)
+
         results = []
         for m in matches:
             # Filter out spelling errors if we rely on SymSpell for that 
@@ -147,81 +306,134 @@ class LanguageToolDetector(BaseDetector):
             if length is None:
                 length = getattr(m, 'length', 0)
 
-            results.append(DetectionResult(
+            results.append(Detection(
                 error_type=etype,
-                message=m.message,
+                message=_intern(m.message),
                 start_index=m.offset,
                 end_index=m.offset + length,
-                suggestions=m.replacements[:3],
+                suggestions=tuple(m.replacements[:3]),
                 confidence=0.8,
                 source="languagetool"
             ))
         return results
 
-class CustomSpacyGrammarDetector(BaseDetector):
-    def detect(self, text: str, doc: Optional[Any] = None) -> List[DetectionResult]:
-        if not doc:
-            return []
-        
-        results = []
-        for token in doc:
-            # Simple Subject-Verb Agreement (rudimentary heuristic)
-            if token.dep_ == 'nsubj' and token.head.pos_ == 'VERB':
-                subj = token
-                verb = token.head
-                
-                # Check morphology
-                subj_num = subj.morph.get("Number")
-                verb_num = verb.morph.get("Number")
-                verb_pers = verb.morph.get("Person")
-                
-                # Only check if both have Number features
-                if subj_num and verb_num:
-                    if subj_num != verb_num:
-                        # Edge cases exist (collective nouns, etc.), assign detection check
-                        # Exception: "You are" -> You(Singular/Plural) vs Are(Plural) - usually fine.
-                        # spaCy morph is decent.
-                        
-                        # Filter out past tense verbs where agreement is often implicit/same (except was/were)
-                        if verb.tag_ == 'VBD' and verb.lemma_ != 'be':
-                            continue
-                            
-                        results.append(DetectionResult(
-                            error_type=ErrorType.AGREEMENT,
-                            message=f"Possible subject-verb agreement error: '{subj.text}' ({subj_num[0]}) vs '{verb.text}' ({verb_num[0]})",
-                            start_index=subj.idx, # highlighting subject or verb? usually highlight verb or relationship
-                            end_index=verb.idx + len(verb.text), # span both? or just verb
-                            suggestions=[], # Hard to suggest without generating
-                            confidence=0.6,
-                            source="spacy_rule"
-                        ))
-
-            # Determiner-Noun Agreement
-            if token.pos_ == 'DET' and token.head.pos_ == 'NOUN':
-                det = token
-                noun = token.head
-                
-                det_num = det.morph.get("Number") # e.g. 'This' -> Sing
-                noun_num = noun.morph.get("Number") # e.g. 'apples' -> Plur
-                
-                if det_num and noun_num:
-                    # 'This apples' -> mismatch
-                    if det_num != noun_num:
-                        # exclude some cases? e.g. "The" has no number
-                        results.append(DetectionResult(
-                            error_type=ErrorType.AGREEMENT,
-                            message=f"Determiner agreement error: '{det.text}' ({det_num[0]}) vs '{noun.text}' ({noun_num[0]})",
-                            start_index=det.idx,
-                            end_index=noun.idx + len(noun.text),
-                            suggestions=[],
-                            confidence=0.7,
-                            source="spacy_rule"
-                        ))
+class CustomSpacyGrammarDetector(TokenDetector):
+    def on_doc(self, doc: Any, text: str, emit: Callable[[Detection], None]) -> None:
+        if not len(doc):
+            return
+        # Find candidate (token, head) pairs for both rules with numpy over one
+        # to_array call; only the few survivors get their morphology inspected.
+        arr = doc.to_array([DEP, HEAD, POS])
+        dep, pos = arr[:, 0], arr[:, 2]
+        # HEAD is the head's offset from the token, stored as uint64.
+        heads = np.arange(len(doc)) + arr[:, 1].astype(np.int64)
+        head_pos = pos[heads]
 
-        return results
+        # Subject-verb: nsubj attached to a VERB
+        for i in np.flatnonzero((dep == doc.vocab.strings["nsubj"]) & (head_pos == VERB)):
+            self._check_subject_verb(doc[int(i)], doc[int(heads[i])], emit)
+
+        # Determiner-noun: DET attached to a NOUN
+        for i in np.flatnonzero((pos == DET) & (head_pos == NOUN)):
+            self._check_determiner(doc[int(i)], doc[int(heads[i])], emit)
+
+    def _check_subject_verb(self, subj: Any, verb: Any, emit: Callable[[Detection], None]) -> None:
+        # Simple Subject-Verb Agreement (rudimentary heuristic)
+        # Check morphology
+        subj_num = subj.morph.get("Number")
+        verb_num = verb.morph.get("Number")
 
-class StyleDetector(BaseDetector):
-    def get_readability_metrics(self, text: str) -> ReadabilityMetrics:
+        # Only check if both have Number features
+        if subj_num and verb_num:
+            if subj_num != verb_num:
+                # Edge cases exist (collective nouns, etc.), assign detection check
+                # Exception: "You are" -> You(Singular/Plural) vs Are(Plural) - usually fine.
+                # spaCy morph is decent.
+
+                # Filter out past tense verbs where agreement is often implicit/same (except was/were)
+                # (checked on the surface form so the lemmatizer can stay disabled)
+                if verb.tag_ == 'VBD' and verb.lower_ not in ('was', 'were'):
+                    return
+
+                emit(Detection(
+                    error_type=ErrorType.AGREEMENT,
+                    message=_intern(f"Possible subject-verb agreement error: '{subj.text}' ({subj_num[0]}) vs '{verb.text}' ({verb_num[0]})"),
+                    start_index=subj.idx, # highlighting subject or verb? usually highlight verb or relationship
+                    end_index=verb.idx + len(verb.text), # span both? or just verb
+                    suggestions=(), # Hard to suggest without generating
+                    confidence=0.6,
+                    source="spacy_rule"
+                ))
+
+    def _check_determiner(self, det: Any, noun: Any, emit: Callable[[Detection], None]) -> None:
+        # Determiner-Noun Agreement
+        det_num = det.morph.get("Number") # e.g. 'This' -> Sing
+        noun_num = noun.morph.get("Number") # e.g. 'apples' -> Plur
+
+        if det_num and noun_num:
+            # 'This apples' -> mismatch
+            if det_num != noun_num:
+                # exclude some cases? e.g. "The" has no number
+                emit(Detection(
+                    error_type=ErrorType.AGREEMENT,
+                    message=_intern(f"Determiner agreement error: '{det.text}' ({det_num[0]}) vs '{noun.text}' ({noun_num[0]})"),
+                    start_index=det.idx,
+                    end_index=noun.idx + len(noun.text),
+                    suggestions=(),
+                    confidence=0.7,
+                    source="spacy_rule"
+                ))
+
+class StyleDetector(TokenDetector):
+    # Wordy phrase -> concise replacement
+    WORDY_MAP = {
+        "in order to": "to",
+        "due to the fact that": "because",
+        "at this point in time": "now",
+        "utilize": "use"
+    }
+
+    def __init__(self):
+        # Built lazily from the first doc's vocab (see _get_wordy_matcher).
+        self._wordy_matcher = None
+        # Dale-Chall easy words, loaded once so difficult words can be counted
+        # straight off the parsed doc instead of through textstat's per-call tokenizing.
+        self._easy_words = self._load_easy_words()
+
+    def _load_easy_words(self) -> Optional[frozenset]:
+        try:
+            path = pkg_resources.resource_filename("textstat", "resources/en/easy_words.txt")
+            with open(path, encoding="utf-8") as f:
+                return frozenset(line.strip().lower() for line in f if line.strip())
+        except Exception as e:
+            logger.warning(f"Could not load Dale-Chall easy words, using textstat: {e}")
+            return None
+
+    def _difficult_counts(self, doc: Any) -> Tuple[int, int, int]:
+        """
+        Dale-Chall hard words, unique difficult (2+ syllable) words and Gunning fog
+        (3+ syllable) difficult words, in one pass over the doc's words.
+        """
+        hard = [t for t in doc if t.is_alpha and t.lower_ not in self._easy_words]
+        syllables = {w: textstat.syllable_count(w) for w in {t.lower_ for t in hard}}
+        # Like textstat, "unique" is by surface form ("Word" and "word" count twice).
+        difficult = len({t.text for t in hard if syllables[t.lower_] >= 2})
+        fog_difficult = sum(1 for t in hard if syllables[t.lower_] >= 3)
+        return len(hard), difficult, fog_difficult
+
+    def _get_wordy_matcher(self, vocab) -> PhraseMatcher:
+        # One PhraseMatcher finds every phrase in a single pass over the tokens,
+        # matching on LOWER so it is case-insensitive but token-aware
+        # ("utilize" no longer fires inside "utilized").
+        if self._wordy_matcher is None or self._wordy_matcher.vocab is not vocab:
+            matcher = PhraseMatcher(vocab, attr="LOWER")
+            for phrase in self.WORDY_MAP:
+                # Each phrase is its own match label so the hit maps straight back to WORDY_MAP.
+                matcher.add(phrase, [Doc(vocab, words=phrase.split())])
+            self._wordy_matcher = matcher
+        return self._wordy_matcher
+
+    def get_readability_metrics(self, text: str, doc: Optional[Any] = None) -> ReadabilityMetrics:
         if not text or not text.strip():
             # Return zeros/defaults
             return ReadabilityMetrics(
@@ -236,78 +448,114 @@ class StyleDetector(BaseDetector):
                 gunning_fog=0.0,
                 text_standard="N/A"
             )
-        
+
+        # Each textstat formula re-counts words/sentences/syllables on its own.
+        # Count the shared primitives once and apply the (English) formulas
+        # directly; zero guards mirror textstat's, which return 0.0.
+        sentences = textstat.sentence_count(text)
+        words = textstat.lexicon_count(text)
+        syllables = textstat.syllable_count(text)
+        letters = textstat.letter_count(text)
+        chars = textstat.char_count(text)
+        # ARI counts punctuation-only "words" too, since their characters are counted.
+        words_with_punct = textstat.lexicon_count(text, removepunct=False)
+        polysyllables = textstat.polysyllabcount(text)
+        if doc is not None and self._easy_words is not None:
+            hard_words, difficult_words, fog_difficult = self._difficult_counts(doc)
+        else:
+            # Same counts as above; Dale-Chall's is the non-unique count at threshold 0.
+            hard_words = textstat.difficult_words(text, syllable_threshold=0, unique=False)
+            difficult_words = textstat.difficult_words(text)
+            fog_difficult = textstat.difficult_words(text, syllable_threshold=3, unique=False)
+
+        words_per_sentence = words / sentences if sentences else 0.0
+        syllables_per_word = syllables / words if words else 0.0
+
+        if words_per_sentence and syllables_per_word:
+            flesch_reading_ease = 206.835 - 1.015 * words_per_sentence - 84.6 * syllables_per_word
+            flesch_kincaid_grade = 0.39 * words_per_sentence + 11.8 * syllables_per_word - 15.59
+        else:
+            flesch_reading_ease = flesch_kincaid_grade = 0.0
+
+        smog_index = (1.043 * (30 * polysyllables / sentences) ** 0.5 + 3.1291) if sentences else 0.0
+
+        letters_per_100 = letters / words * 100 if words else 0.0
+        sentences_per_100 = sentences / words * 100 if words else 0.0
+        if letters_per_100 and sentences_per_100:
+            coleman_liau_index = 0.058 * letters_per_100 - 0.296 * sentences_per_100 - 15.8
+        else:
+            coleman_liau_index = 0.0
+
+        chars_per_word = chars / words_with_punct if words_with_punct else 0.0
+        if chars_per_word and words_per_sentence:
+            automated_readability_index = 4.71 * chars_per_word + 0.5 * words_per_sentence - 21.43
+        else:
+            automated_readability_index = 0.0
+
+        gunning_fog = 0.4 * (words_per_sentence + 100 * fog_difficult / words) if words else 0.0
+
+        if words:
+            pct_hard = 100 * hard_words / words
+            dale_chall = 0.1579 * pct_hard + 0.0496 * words_per_sentence
+            if pct_hard > 5:
+                dale_chall += 3.6365
+        else:
+            dale_chall = 0.0
+
         return ReadabilityMetrics(
-            flesch_reading_ease=textstat.flesch_reading_ease(text),
-            smog_index=textstat.smog_index(text),
-            flesch_kincaid_grade=textstat.flesch_kincaid_grade(text),
-            coleman_liau_index=textstat.coleman_liau_index(text),
-            automated_readability_index=textstat.automated_readability_index(text),
-            dale_chall_readability_score=textstat.dale_chall_readability_score(text),
-            difficult_words=textstat.difficult_words(text),
+            flesch_reading_ease=flesch_reading_ease,
+            smog_index=smog_index,
+            flesch_kincaid_grade=flesch_kincaid_grade,
+            coleman_liau_index=coleman_liau_index,
+            automated_readability_index=automated_readability_index,
+            dale_chall_readability_score=dale_chall,
+            difficult_words=difficult_words,
+            # Linsear-Write / text_standard have no cheap closed form over the counts above.
             linsear_write_formula=textstat.linsear_write_formula(text),
-            gunning_fog=textstat.gunning_fog(text),
+            gunning_fog=gunning_fog,
             text_standard=str(textstat.text_standard(text))
         )
 
-    def detect(self, text: str, doc: Optional[Any] = None) -> List[DetectionResult]:
-        results = []
-        if not doc:
-            return results
-
+    def on_token(self, token: Any, emit: Callable[[Detection], None]) -> None:
         # 1. Passive Voice Detection (Heuristic: auxpass)
-        for token in doc:
-            if token.dep_ == "auxpass":
-                # The head is usually the main verb
-                verb = token.head
-                results.append(DetectionResult(
-                    error_type=ErrorType.STYLE,
-                    message="Passive voice detected. Consider active voice.",
-                    start_index=token.idx,
-                    end_index=verb.idx + len(verb.text),
-                    suggestions=[],
-                    confidence=0.6,
-                    source="style_heuristic_passive"
-                ))
+        if token.dep_ == "auxpass":
+            # The head is usually the main verb
+            verb = token.head
+            emit(Detection(
+                error_type=ErrorType.STYLE,
+                message="Passive voice detected. Consider active voice.",
+                start_index=token.idx,
+                end_index=verb.idx + len(verb.text),
+                suggestions=(),
+                confidence=0.6,
+                source="style_heuristic_passive"
+            ))
 
+    def on_sent(self, sent: Any, emit: Callable[[Detection], None]) -> None:
         # 2. Overly long sentences
-        for sent in doc.sents:
-            if len(sent) > 40: # threshold
-                results.append(DetectionResult(
-                    error_type=ErrorType.STYLE,
-                    message="Sentence is very long (40+ tokens). Consider splitting.",
-                    start_index=sent.start_char,
-                    end_index=sent.end_char,
-                    suggestions=[],
-                    confidence=0.5,
-                    source="style_heuristic_length"
-                ))
-
-        # 3. Wordy constructions (Simple list)
-        wordy_map = {
-            "in order to": "to",
-            "due to the fact that": "because",
-            "at this point in time": "now",
-            "utilize": "use"
-        }
-        
-        # Simple string search (naive) - for production, use spaCy Matcher
-        text_lower = text.lower()
-        for phrase, replacement in wordy_map.items():
-            start = 0
-            while True:
-                idx = text_lower.find(phrase, start)
-                if idx == -1:
-                    break
-                results.append(DetectionResult(
-                    error_type=ErrorType.STYLE,
-                    message=f"Wordy construction '{phrase}'.",
-                    start_index=idx,
-                    end_index=idx + len(phrase),
-                    suggestions=[replacement],
-                    confidence=0.8,
-                    source="style_heuristic_wordy"
-                ))
-                start = idx + len(phrase)
+        if len(sent) > 40: # threshold
+            emit(Detection(
+                error_type=ErrorType.STYLE,
+                message="Sentence is very long (40+ tokens). Consider splitting.",
+                start_index=sent.start_char,
+                end_index=sent.end_char,
+                suggestions=(),
+                confidence=0.5,
+                source="style_heuristic_length"
+            ))
 
-        return results
+    def on_doc(self, doc: Any, text: str, emit: Callable[[Detection], None]) -> None:
+        # 3. Wordy constructions
+        matcher = self._get_wordy_matcher(doc.vocab)
+        for match_id, start, end in matcher(doc):
+            phrase = doc.vocab.strings[match_id]
+            span = doc[start:end]
+            emit(Detection(
+                error_type=ErrorType.STYLE,
+                message=_intern(f"Wordy construction '{phrase}'."),
+                start_index=span.start_char,
+                end_index=span.end_char,
+                suggestions=(self.WORDY_MAP[phrase],),
+                confidence=0.8,
+                source="style_heuristic_wordy"
+            ))
@@ -1,12 +1,15 @@
 import os
 import json
-from typing import List, Optional
+from typing import Dict, Iterator, List, Optional
 from openai import OpenAI
 from dotenv import load_dotenv
-from schemas import DetectionResult, ErrorType
+from schemas import Detection, DetectionResult, ErrorType
 
 load_dotenv()
 
+# gpt-4o-mini's output limit, in tokens.
+MAX_COMPLETION_TOKENS = 16384
+
 class LLMHandler:
     def __init__(self):
         self.api_key = os.getenv("OPENAI_API_KEY")
@@ -14,6 +17,8 @@ class LLMHandler:
         self.available = False
         if self.api_key:
             try:
+                # One long-lived client: the SDK's own connection pool keeps
+                # connections warm, so back-to-back calls skip the TLS handshake.
                 self.client = OpenAI(api_key=self.api_key)
                 self.available = True
             except Exception as e:
@@ -23,76 +28,139 @@ class LLMHandler:
         """
         Explain a specific error in simple language using LLM.
         """
-        if not self.available:
-            return "Explanation unavailable (LLM not configured)."
+        return "".join(self.stream_explanation(error, context)).strip()
 
-        prompt = f"""
-        Explain the following grammar/spelling error to a user in simple terms.
-        Error Message: "{error.message}"
-        Context: "{context}"
-        Offending Text: "{context[error.start_index:error.end_index] if len(context) > error.end_index else 'unknown'}"
-        keep it brief (1 sentence).
+    def stream_explanation(self, error: DetectionResult, context: str) -> Iterator[str]:
+        """
+        Like explain_error, but yields the explanation as it is generated so a UI
+        can render the first words immediately (e.g. via st.write_stream).
         """
+        if not self.available:
+            yield "Explanation unavailable (LLM not configured)."
+            return
+
+        offending = context[error.start_index:error.end_index] if len(context) > error.end_index else "unknown"
+        prompt = (
+            f'Error: "{error.message}"\n'
+            f'Text: "{context}"\n'
+            f'Offending: "{offending}"'
+        )
         
         try:
             response = self.client.chat.completions.create(
                 model="gpt-4o-mini",
                 messages=[
-                    {"role": "system", "content": "You are a helpful proofreading assistant."},
+                    {"role": "system", "content": "Proofreader. Explain the error simply, in 1 sentence."},
+                    {"role": "user", "content": prompt}
+                ],
+                max_tokens=60,
+                stream=True
+            )
+            for chunk in response:
+                if chunk.choices and chunk.choices[0].delta.content:
+                    yield chunk.choices[0].delta.content
+        except Exception as e:
+            yield f"Error generating explanation: {str(e)}"
+
+    def batch_explain(self, errors: List[DetectionResult], context: str) -> Dict[str, str]:
+        """
+        Explain several errors with a single request instead of one per error.
+        Returns {error position in `errors` (as str): explanation}.
+        """
+        if not self.available or not errors:
+            return {}
+
+        items = [
+            {"id": str(i), "message": e.message, "offending": context[e.start_index:e.end_index]}
+            for i, e in enumerate(errors)
+        ]
+        prompt = (
+            'Explain each error simply, in 1 sentence. '
+            'JSON: {"explanations": [{"id": "...", "text": "..."}]}\n'
+            f'Text: "{context}"\n'
+            f'{json.dumps({"items": items})}'
+        )
+
+        try:
+            response = self.client.chat.completions.create(
+                model="gpt-4o-mini",
+                messages=[
+                    {"role": "system", "content": "Proofreader. Output valid JSON only."},
                     {"role": "user", "content": prompt}
                 ],
-                max_tokens=60
+                response_format={"type": "json_object"},
+                temperature=0.0,
+                # Same per-error budget as stream_explanation, plus the JSON wrapping.
+                max_tokens=min(80 * len(errors) + 20, MAX_COMPLETION_TOKENS)
             )
-            return response.choices[0].message.content.strip()
+            choice = response.choices[0]
+            if choice.finish_reason == "length":
+                # The JSON is cut off mid-object, so there is nothing to parse.
+                print(f"LLM batch explanation hit max_tokens for {len(errors)} errors; no explanations returned")
+                return {}
+            data = json.loads(choice.message.content)
+            explanations = {}
+            for item in data.get("explanations", []):
+                if isinstance(item, dict) and isinstance(item.get("text"), str):
+                    explanations[str(item.get("id"))] = item["text"].strip()
+            return explanations
         except Exception as e:
-            return f"Error generating explanation: {str(e)}"
+            print(f"LLM batch explanation failed: {e}")
+            return {}
 
-    def check_edge_cases(self, text: str) -> List[DetectionResult]:
+    def check_edge_cases(self, text: str) -> List[Detection]:
         """
         Use LLM to find contextual ambiguity or subtle errors not caught by rules.
         """
         if not self.available:
             return []
 
-        prompt = """
-        Analyze the following text for subtle contextual grammar errors, malapropisms, or logical inconsistencies in phrasing.
-        Do NOT report style issues, spelling, or basic grammar (rules cover those).
-        Focus on things like:
-        - "There" vs "Their" if valid in POS but wrong in context (though rules might catch this).
-        - "Affect" vs "Effect".
-        - Wrong distinct word usage (e.g. "for all intensive purposes").
-        
-        Return JSON format:
-        {
-            "errors": [
-                {"message": "...", "start_index": 0, "end_index": 5, "suggestion": "..."}
-            ]
-        }
-        Recalculate indices carefully based on the provided text.
-        If no errors, return {"errors": []}.
-        """
+        # Kept terse: prompt tokens are paid (in latency too) on every call.
+        prompt = (
+            'Find only contextual errors: malapropisms, wrong word choice (affect/effect, their/there, '
+            '"for all intensive purposes"), illogical phrasing. Skip spelling, style and basic grammar.\n'
+            'JSON: {"errors": [{"message": "...", "start_index": 0, "end_index": 5, "suggestion": "..."}]} '
+            'with character indices into the text; {"errors": []} if none.'
+        )
         
         try:
             response = self.client.chat.completions.create(
                 model="gpt-4o-mini",
                 messages=[
-                    {"role": "system", "content": "You are a strict proofreader. Output valid JSON only."},
+                    {"role": "system", "content": "Strict proofreader. Output valid JSON only."},
                     {"role": "user", "content": f"{prompt}\n\nText: {text}"}
                 ],
                 response_format={"type": "json_object"},
-                temperature=0.0
+                temperature=0.0,
+                # Findings grow with the text (~4 chars per token), so scale the
+                # budget with it rather than truncating long texts' JSON.
+                max_tokens=min(max(400, len(text) // 4), MAX_COMPLETION_TOKENS)
             )
-            data = json.loads(response.choices[0].message.content)
+            choice = response.choices[0]
+            if choice.finish_reason == "length":
+                # The JSON is cut off mid-object, so there is nothing to parse.
+                print("LLM edge case check hit max_tokens; no edge cases returned")
+                return []
+            data = json.loads(choice.message.content)
             results = []
             for item in data.get("errors", []):
-                # We trust LLM indices, but should validate them?
-                # For now, simplistic mapping.
-                results.append(DetectionResult(
+                # We trust LLM indices, but Detection does no validation, so at
+                # least drop items that aren't well-formed.
+                message = item.get("message")
+                try:
+                    start_index = int(item["start_index"])
+                    end_index = int(item["end_index"])
+                except (KeyError, TypeError, ValueError):
+                    continue
+                if not isinstance(message, str):
+                    continue
+                suggestion = item.get("suggestion")
+                results.append(Detection(
                     error_type=ErrorType.GRAMMAR, # Logic/Context falls under grammar approx
-                    message=item.get("message"),
-                    start_index=item.get("start_index"),
-                    end_index=item.get("end_index"),
-                    suggestions=[item.get("suggestion")] if item.get("suggestion") else [],
+                    message=message,
+                    start_index=start_index,
+                    end_index=end_index,
+                    suggestions=(str(suggestion),) if suggestion else (),
                     confidence=0.7,
                     source="llm_edge_case"
                 ))
@@ -109,10 +177,18 @@ class LLMHandler:
             response = self.client.chat.completions.create(
                 model="gpt-4o-mini",
                 messages=[
-                    {"role": "system", "content": "You are an expert editor. Improve clarity and flow. Maintain original meaning."},
+                    {"role": "system", "content": "Expert editor. Improve clarity and flow; keep the meaning."},
                     {"role": "user", "content": f"Rewrite this text:\n{text}"}
-                ]
+                ],
+                # A rewrite is about as long as its input (~4 chars per token);
+                # allow twice that, so only runaway generations hit the cap.
+                max_tokens=min(max(64, len(text) // 2), MAX_COMPLETION_TOKENS)
             )
-            return response.choices[0].message.content.strip()
+            choice = response.choices[0]
+            rewritten = choice.message.content.strip()
+            if choice.finish_reason == "length":
+                print("LLM rewrite hit max_tokens; returning partial rewrite")
+                return f"{rewritten}\n\n[Rewrite truncated: the text is too long to rewrite in one request.]"
+            return rewritten
         except Exception:
             return "Rewrite failed."
@@ -1,54 +1,88 @@
 from typing import List
 import unicodedata
+import heapq
+from concurrent.futures import ThreadPoolExecutor
 from spacy_provider import SpacyWrapper
-from detectors import SpellingDetector, LanguageToolDetector, CustomSpacyGrammarDetector, StyleDetector
+from detectors import SpellingDetector, LanguageToolDetector, CustomSpacyGrammarDetector, StyleDetector, run_token_detectors
 from llm_handler import LLMHandler
-from schemas import AnalysisResponse, DetectionResult, ErrorType
+from schemas import AnalysisResponse, Detection
 
 class PipelineManager:
     def __init__(self):
         # Initialize components
-        self.spacy_nlp = SpacyWrapper.get_nlp()
+        # Load the parser now, so the slow first load happens while the pipeline
+        # itself is being built rather than inside the first analysis.
+        SpacyWrapper.get_nlp("full")
         self.spelling = SpellingDetector()
         self.lt_grammar = LanguageToolDetector()
         self.spacy_grammar = CustomSpacyGrammarDetector()
         self.style = StyleDetector()
+        # Detectors that only need the parsed doc, per pipeline level; run_local
+        # drives them in one fused pass. The "fast" level has no dependency parse,
+        # so the dep_-based grammar rules are skipped (and StyleDetector's passive
+        # voice check finds nothing).
+        self._local_detectors = {
+            "full": [self.spelling, self.spacy_grammar, self.style],
+            "fast": [self.spelling, self.style],
+        }
         self.llm = LLMHandler()
+        # LanguageTool and the LLM are network-bound, so they run on worker
+        # threads while the local (CPU-bound) detectors run on the caller's thread.
+        self._pool = ThreadPoolExecutor(max_workers=4)
 
-    def analyze(self, text: str, use_llm: bool = False) -> AnalysisResponse:
-        # 1. Normalization
-        # Note: We use the normalized text for analysis.
-        norm_text = unicodedata.normalize('NFC', text)
-        
-        if not norm_text.strip():
-            return AnalysisResponse(errors=[], readability=self.style.get_readability_metrics(""), llm_used=use_llm)
+    def analyze(self, text: str, use_llm: bool = False, level: str = "full") -> AnalysisResponse:
+        return self.analyze_batch([text], use_llm=use_llm, level=level)[0]
+
+    def analyze_batch(self, texts: List[str], use_llm: bool = False, level: str = "full") -> List[AnalysisResponse]:
+        """
+        `level` is "full" (all detectors) or "fast" (spelling/style on a parser-free
+        spaCy pipeline, roughly twice as fast to parse).
+        """
+        # Loaded on first use; raises ValueError for an unknown level.
+        nlp = SpacyWrapper.get_nlp(level)
+        responses = [None] * len(texts)
+        pending = []
+
+        for i, text in enumerate(texts):
+            # 1. Normalization
+            # Note: We use the normalized text for analysis.
+            norm_text = unicodedata.normalize('NFC', text)
+
+            if not norm_text.strip():
+                responses[i] = AnalysisResponse(errors=[], readability=self.style.get_readability_metrics(""), llm_used=use_llm)
+                continue
+
+            # Kick off the remote checks first so their round-trips overlap the
+            # parse and the local detectors (neither needs the spaCy doc).
+            lt_future = self._pool.submit(self.lt_grammar.detect, norm_text)
+            llm_future = self._pool.submit(self.llm.check_edge_cases, norm_text) if use_llm else None
+            pending.append((i, norm_text, lt_future, llm_future))
 
         # 2. Segmentation & Parsing
-        doc = self.spacy_nlp(norm_text)
-        
+        # nlp.pipe amortizes pipeline dispatch across the whole batch.
+        docs = nlp.pipe([p[1] for p in pending], batch_size=32, n_process=1)
+        for (i, norm_text, lt_future, llm_future), doc in zip(pending, docs):
+            responses[i] = self._analyze_doc(norm_text, doc, use_llm, lt_future, llm_future, level)
+
+        return responses
+
+    def _analyze_doc(self, norm_text: str, doc, use_llm: bool, lt_future, llm_future, level: str = "full") -> AnalysisResponse:
         # 3. Parallel Detection
-        # In a real async app we could run these concurrently.
         errors = []
         
-        # Spell Check
-        errors.extend(self.spelling.detect(norm_text, doc))
-        
-        # Grammar (LT + Custom)
-        errors.extend(self.lt_grammar.detect(norm_text, doc))
-        errors.extend(self.spacy_grammar.detect(norm_text, doc))
-        
-        # Style
-        errors.extend(self.style.detect(norm_text, doc))
+        # Spell Check + Grammar (Custom) + Style, sharing one walk over the doc
+        errors.extend(self.run_local(doc, norm_text, level))
 
-        # LLM Edge Cases
-        if use_llm:
-            errors.extend(self.llm.check_edge_cases(norm_text))
+        # Grammar (LT) + LLM Edge Cases
+        errors.extend(lt_future.result())
+        if llm_future is not None:
+            errors.extend(llm_future.result())
             
         # 4. Conflict Resolution
         final_errors = self._resolve_conflicts(errors)
         
         # 5. Readability
-        readability = self.style.get_readability_metrics(norm_text)
+        readability = self.style.get_readability_metrics(norm_text, doc)
 
         # 6. Optional: LLM Explanations for top errors? 
         # The prompt says LLM used for "Explaining detected errors".
@@ -57,80 +91,68 @@ class PipelineManager:
         # We will leave `llm_explanations` empty here, user can call separate endpoint or we can add later.
         
         return AnalysisResponse(
-            errors=final_errors,
+            errors=[e.to_result() for e in final_errors],
             readability=readability,
             llm_used=use_llm
         )
 
-    def _resolve_conflicts(self, errors: List[DetectionResult]) -> List[DetectionResult]:
+    def run_local(self, doc, text: str, level: str = "full") -> List[Detection]:
+        return run_token_detectors(self._local_detectors[level], text, doc)
+
+    def _resolve_conflicts(self, errors: List[Detection]) -> List[Detection]:
         if not errors:
             return []
             
-        # Priority mapping: Higher number = higher priority
-        priority = {
-            ErrorType.SPELLING: 3,
-            ErrorType.GRAMMAR: 2,
-            ErrorType.AGREEMENT: 2,
-            ErrorType.PUNCTUATION: 2,
-            ErrorType.STYLE: 1
-        }
-        
         # Sort by start_index, then by priority (descending), then confidence (descending)
-        # We want higher priority/confidence first so we can keep them when iterating
-        errors.sort(key=lambda x: (x.start_index, -priority.get(x.error_type, 0), -x.confidence))
-        
-        merged = []
-        matches_to_remove = set()
+        # (priority is precomputed on each Detection from schemas.ERROR_PRIORITY)
+        errors.sort(key=lambda x: (x.start_index, -x.priority, -x.confidence))
         
-        # Robust merge strategy:
-        # If two errors OVERLAP significantly, pick the winner.
+        # An error is suppressed if ANY error overlapping it outranks it on
+        # (priority, confidence); equal ranks both survive. Suppressed errors can
+        # still suppress others.
+        #
+        # Sweep-line: every overlapping pair (a, b) with a before b in sort order
+        # has a.start <= b.start < a.end, i.e. `a` is still "active" when `b` is
+        # reached. Two heaps over the active errors answer both directions:
+        #   - max-heap: does any active error outrank the current one?
+        #   - min-heap: which active errors does the current one outrank?
+        # Each error is pushed/popped at most once per heap -> O(N log N).
+        ranks = [(e.priority, e.confidence) for e in errors]
+        suppressed = [False] * len(errors)
+        max_heap = []  # (-priority, -confidence, idx)
+        min_heap = []  # (priority, confidence, idx)
         
-        for i in range(len(errors)):
-            if i in matches_to_remove:
+        for i, current in enumerate(errors):
+            # Empty/inverted spans never overlap anything.
+            if current.end_index <= current.start_index:
                 continue
-                
-            current = errors[i]
-            # keep_current = True # Unused variable
+            rank = ranks[i]
             
-            # Check against already added (looking back? No, we sorted. Looking forward?)
-            # Actually since we sorted by start index, we can just check against other items to see if we should suppress current.
+            # Drop errors that ended before this one starts.
+            while max_heap and errors[max_heap[0][2]].end_index <= current.start_index:
+                heapq.heappop(max_heap)
+            if max_heap and (-max_heap[0][0], -max_heap[0][1]) > rank:
+                suppressed[i] = True
             
-            is_suppressed = False
-            for j in range(len(errors)):
-                if i == j: continue
-                other = errors[j]
-                
-                # Check overlap
-                overlap = max(0, min(current.end_index, other.end_index) - max(current.start_index, other.start_index))
-                if overlap > 0:
-                    # Decide who wins
-                    p_curr = priority.get(current.error_type, 0)
-                    p_other = priority.get(other.error_type, 0)
-                    
-                    if p_other > p_curr:
-                        is_suppressed = True
-                        break
-                    elif p_other == p_curr:
-                        if other.confidence > current.confidence:
-                            is_suppressed = True
-                            break
-                        elif other.confidence == current.confidence and j < i: 
-                            # If tied, and 'other' appeared earlier in list (via sort), 'other' wins.
-                            # 'j < i' check is redundant if we are checking all, but strictly we just want ONE survivor.
-                            # If we suppress current because of j (where j < i or j > i), correct.
-                            # Usually simple greedy: Only add if no conflict with *already merged*.
-                            # But that depends on sort order being perfect.
-                            # The pairwise suppression is safer.
-                            
-                            # However, if j > i (comes later), we haven't processed j yet.
-                            # If we suppress current now, we assume j will be added later.
-                            # But j might be suppressed by k.
-                            # This global pairwise suppression is slightly risky if circular (A>B, B>C, C>A).
-                            # Priority tiers prevent circularity mostly.
-                            pass
+            # Every active error ranked below the current one loses to it.
+            while min_heap and (min_heap[0][0], min_heap[0][1]) < rank:
+                j = heapq.heappop(min_heap)[2]
+                if errors[j].end_index > current.start_index:
+                    suppressed[j] = True
             
-            if not is_suppressed:
-                if current not in merged:
-                    merged.append(current)
+            heapq.heappush(max_heap, (-rank[0], -rank[1], i))
+            heapq.heappush(min_heap, (rank[0], rank[1], i))
+        
+        merged = []
+        seen = set()
+        for i, current in enumerate(errors):
+            if suppressed[i]:
+                continue
+            # Drop exact duplicates (e.g. the same hit reported twice);
+            # Detection is frozen, so it hashes by value.
+            if current in seen:
+                continue
+            seen.add(current)
+            merged.append(current)
 
         return merged
@@ -1,6 +1,7 @@
+from dataclasses import dataclass, field
 from enum import Enum
-from typing import List, Optional, Dict, Any
-from pydantic import BaseModel, Field
+from typing import List, Optional, Dict, Any, Tuple
+from pydantic import BaseModel, ConfigDict, Field
 
 class ErrorType(str, Enum):
     SPELLING = "spelling"
@@ -10,14 +11,57 @@ class ErrorType(str, Enum):
     STYLE = "style"
 
 class DetectionResult(BaseModel):
+    # Immutable, and hashable thanks to the tuple of suggestions.
+    model_config = ConfigDict(frozen=True)
+
     error_type: ErrorType
     message: str
     start_index: int
     end_index: int
-    suggestions: List[str] = Field(default_factory=list)
+    suggestions: Tuple[str, ...] = ()
     confidence: float = Field(..., ge=0.0, le=1.0)
     source: str  # e.g. "symspell", "languagetool", "spacy_rule"
 
+# Conflict-resolution priority: when spans overlap, higher number wins.
+ERROR_PRIORITY = {
+    ErrorType.SPELLING: 3,
+    ErrorType.GRAMMAR: 2,
+    ErrorType.AGREEMENT: 2,
+    ErrorType.PUNCTUATION: 2,
+    ErrorType.STYLE: 1
+}
+
+@dataclass(slots=True, frozen=True, kw_only=True)
+class Detection:
+    """
+    Internal, validation-free counterpart of DetectionResult used by the
+    detectors and conflict resolution; converted at the API boundary.
+    """
+    error_type: ErrorType
+    message: str
+    start_index: int
+    end_index: int
+    suggestions: Tuple[str, ...] = ()
+    confidence: float
+    source: str
+    # Looked up once here so sorting/comparing doesn't hit ERROR_PRIORITY per call.
+    priority: int = field(init=False, repr=False)
+
+    def __post_init__(self):
+        object.__setattr__(self, "priority", ERROR_PRIORITY.get(self.error_type, 0))
+
+    def to_result(self) -> DetectionResult:
+        # Fields were produced by our own detectors, so skip pydantic validation.
+        return DetectionResult.model_construct(
+            error_type=self.error_type,
+            message=self.message,
+            start_index=self.start_index,
+            end_index=self.end_index,
+            suggestions=self.suggestions,
+            confidence=self.confidence,
+            source=self.source
+        )
+
 class ReadabilityMetrics(BaseModel):
     flesch_reading_ease: float
     smog_index: float
@@ -1,27 +1,164 @@
 import spacy
 import subprocess
 import sys
+import os
 import logging
+import tempfile
+import threading
+from typing import Callable
 
 logger = logging.getLogger(__name__)
 
+MODEL_NAME = "en_core_web_sm"
+
+# Components the detectors never read. tagger/parser/attribute_ruler stay on:
+# in en_core_web_sm the attribute_ruler is what fills in `pos_` and `morph`.
+DISABLED_PIPES = ["ner", "lemmatizer"]
+
+# Pipeline levels. "full" runs the dependency parser, which the dep_-based rules
+# (subject-verb agreement, passive voice) need. "fast" drops it and gets sentence
+# boundaries from the much cheaper `senter` instead, for spelling/style-only checks.
+LEVELS = ("full", "fast")
+FAST_EXCLUDED_PIPES = DISABLED_PIPES + ["parser"]
+
+# Where precomputed artifacts (serialized pipeline, SymSpell pickle) are kept between runs.
+CACHE_DIR = os.getenv("EDITOR_CACHE_DIR", os.path.join(os.path.expanduser("~"), ".cache", "editor"))
+
+def atomic_write(path: str, write: Callable[[str], None]) -> None:
+    """
+    Create `path` by calling `write(tmp_path)` and renaming the result into place,
+    so concurrent workers never read a partially written cache file.
+    """
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    # A fresh temp file per call, so writers in other processes or threads
+    # never share (or clean up) each other's file.
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+    os.close(fd)
+    try:
+        write(tmp_path)
+        os.replace(tmp_path, path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+def _write_bytes(data: bytes) -> Callable[[str], None]:
+    def write(path: str) -> None:
+        with open(path, "wb") as f:
+            f.write(data)
+    return write
+
 class SpacyWrapper:
-    _nlp = None
+    # {level: loaded pipeline}
+    _nlp = {}
+    # Pipelines are first requested from worker threads; loading under one lock
+    # means each level is built once, against the vocab of the "full" pipeline
+    # that is actually kept. Reentrant since "fast" loads "full" first.
+    _lock = threading.RLock()
+
+    @classmethod
+    def get_nlp(cls, level: str = "full"):
+        if level not in LEVELS:
+            raise ValueError(f"Unknown pipeline level '{level}', expected one of {LEVELS}")
+        nlp = cls._nlp.get(level)
+        if nlp is not None:
+            return nlp
+        with cls._lock:
+            return cls._get_nlp_locked(level)
 
     @classmethod
-    def get_nlp(cls):
-        if cls._nlp is None:
+    def _get_nlp_locked(cls, level: str):
+        if level not in cls._nlp:
+            if level == "full":
+                cls._nlp[level] = cls._load_full()
+            else:
+                full = cls.get_nlp("full")
+                # Blank fallback: there is no parser to drop, so just reuse it.
+                # Otherwise share the full pipeline's vocab, so both levels use one
+                # StringStore and matchers built against either doc keep working.
+                fast = cls._load_fast(full.vocab) if "parser" in full.pipe_names else None
+                cls._nlp[level] = fast if fast is not None else full
+        return cls._nlp[level]
+
+    @classmethod
+    def _load_full(cls):
+        nlp = cls._load_serialized("full")
+        if nlp is not None:
+            return nlp
+        try:
+            nlp = spacy.load(MODEL_NAME, disable=DISABLED_PIPES)
+            cls._save_serialized(nlp, "full")
+        except OSError:
+            logger.warning(f"Model '{MODEL_NAME}' not found. Attempting download...")
             try:
-                cls._nlp = spacy.load("en_core_web_sm")
-            except OSError:
-                logger.warning("Model 'en_core_web_sm' not found. Attempting download...")
-                try:
-                    subprocess.check_call([sys.executable, "-m", "spacy", "download", "en_core_web_sm"])
-                    cls._nlp = spacy.load("en_core_web_sm")
-                except Exception as e:
-                    logger.error(f"Failed to download/load 'en_core_web_sm': {e}. Falling back to blank 'en' model.")
-                    # Only add sentencizer if not already present (default blank en has nothing)
-                    cls._nlp = spacy.blank("en")
-                    if "sentencizer" not in cls._nlp.pipe_names:
-                        cls._nlp.add_pipe("sentencizer")
-        return cls._nlp
+                subprocess.check_call([sys.executable, "-m", "spacy", "download", MODEL_NAME])
+                nlp = spacy.load(MODEL_NAME, disable=DISABLED_PIPES)
+                cls._save_serialized(nlp, "full")
+            except Exception as e:
+                logger.error(f"Failed to download/load '{MODEL_NAME}': {e}. Falling back to blank 'en' model.")
+                # Only add sentencizer if not already present (default blank en has nothing)
+                nlp = spacy.blank("en")
+                if "sentencizer" not in nlp.pipe_names:
+                    nlp.add_pipe("sentencizer")
+        return nlp
+
+    @classmethod
+    def _load_fast(cls, vocab):
+        nlp = cls._load_serialized("fast", vocab)
+        if nlp is not None:
+            return nlp
+        try:
+            # Excluded (not just disabled) so the parser's weights aren't even loaded.
+            # senter ships disabled in the en_core_web_* packages.
+            nlp = spacy.load(MODEL_NAME, exclude=FAST_EXCLUDED_PIPES, vocab=vocab)
+            nlp.enable_pipe("senter")
+        except Exception as e:
+            logger.warning(f"Could not build the fast '{MODEL_NAME}' pipeline, using the full one: {e}")
+            return None
+        cls._save_serialized(nlp, "fast")
+        return nlp
+
+    @staticmethod
+    def _cache_stem(level: str):
+        # Versioned so upgrading spaCy or the model never loads stale weights, and
+        # keyed on the dropped components so changing those lists never loads a
+        # pipeline built with the old component set.
+        model_version = spacy.util.get_package_version(MODEL_NAME)
+        if model_version is None:
+            return None
+        dropped = FAST_EXCLUDED_PIPES if level == "fast" else DISABLED_PIPES
+        return os.path.join(
+            CACHE_DIR,
+            f"{MODEL_NAME}-{model_version}-spacy{spacy.__version__}-{level}-no-{'+'.join(sorted(dropped))}"
+        )
+
+    @classmethod
+    def _load_serialized(cls, level: str, vocab=None):
+        # Rebuilding from config + one bytes blob skips the package lookup and
+        # per-component directory walk that spacy.load does.
+        stem = cls._cache_stem(level)
+        if stem is None or not os.path.exists(f"{stem}.cfg"):
+            return None
+        try:
+            config = spacy.util.load_config(f"{stem}.cfg")
+            nlp = spacy.util.get_lang_class(config["nlp"]["lang"]).from_config(
+                config, vocab=vocab if vocab is not None else True
+            )
+            with open(f"{stem}.bin", "rb") as f:
+                # A shared vocab is already loaded; don't reset its strings.
+                nlp.from_bytes(f.read(), exclude=["vocab"] if vocab is not None else [])
+            return nlp
+        except Exception as e:
+            logger.warning(f"Ignoring unreadable serialized spaCy pipeline {stem}: {e}")
+            return None
+
+    @classmethod
+    def _save_serialized(cls, nlp, level: str):
+        stem = cls._cache_stem(level)
+        if stem is None:
+            return
+        try:
+            # Bytes first, config last: the config's presence marks a complete cache.
+            atomic_write(f"{stem}.bin", _write_bytes(nlp.to_bytes()))
+            atomic_write(f"{stem}.cfg", nlp.config.to_disk)
+        except Exception as e:
+            logger.warning(f"Could not cache serialized spaCy pipeline to {stem}: {e}")
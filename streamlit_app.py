@@ -1,5 +1,10 @@
+import html
+import re
 import streamlit as st
 import time
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from operator import attrgetter
 from pipeline import PipelineManager
 from schemas import ErrorType
 
@@ -12,7 +17,11 @@ st.set_page_config(
 )
 
 # Custom CSS for styling
-st.markdown("""
+# Minified (comments and runs of whitespace dropped, ~25% smaller) once per
+# process; the one shared string is then sent on each rerun.
+@st.cache_resource
+def _minified_css() -> str:
+    raw = """
 <style>
     /* Global Styles */
     @import url('https://fonts.googleapis.com/css2?family=Outfit:wght@400;600;700&family=Inter:wght@400;500&display=swap');
@@ -111,7 +120,12 @@ st.markdown("""
         border-bottom: 1px solid #f0f0f0;
     }
 </style>
-""", unsafe_allow_html=True)
+"""
+    return re.sub(r"\s+", " ", re.sub(r"/\*.*?\*/", "", raw, flags=re.S)).strip()
+
+# Emitted on every rerun: Streamlit drops elements a rerun doesn't re-emit,
+# so injecting it only once (behind a session flag) would lose the styles.
+st.markdown(_minified_css(), unsafe_allow_html=True)
 
 # Initialize Pipeline
 @st.cache_resource
@@ -120,6 +134,117 @@ def load_pipeline():
 
 pipeline = load_pipeline()
 
+# Re-clicking Analyze on unchanged text (and LLM flag) returns the previous result
+# instead of re-running the detectors and remote checks.
+@st.cache_data(show_spinner=False, max_entries=32)
+def cached_analyze(text: str, use_llm: bool):
+    return pipeline.analyze(text, use_llm=use_llm)
+
+# Analyses run here so the script can keep rendering (previous results, the
+# suggestions panel) instead of blocking the whole rerun on the pipeline.
+@st.cache_resource
+def _executor():
+    return ThreadPoolExecutor(max_workers=2)
+
+# How often a rerun checks on an analysis that is still running.
+ANALYSIS_POLL_SECONDS = 0.2
+
+# CSS classes per error type (other types: plain "error-highlight" / "bg-grammar").
+HIGHLIGHT_CLS = {
+    ErrorType.SPELLING: "error-highlight spelling-err",
+    ErrorType.GRAMMAR: "error-highlight grammar-err",
+    ErrorType.AGREEMENT: "error-highlight grammar-err",
+    ErrorType.STYLE: "error-highlight style-err",
+}
+BADGE_CLS = {ErrorType.SPELLING: "bg-spelling", ErrorType.STYLE: "bg-style"}
+
+# Error types listed under the "Grammar" filter.
+_GRAMMAR_TYPES = frozenset({ErrorType.GRAMMAR, ErrorType.AGREEMENT, ErrorType.PUNCTUATION})
+
+# Suggestion badge; only the (escaped) suggestion text is filled in per use.
+_SUGG_TPL = ('<span style="background:#f1f5f9; color:#334155; padding:4px 8px; border-radius:4px; '
+             'margin-right:6px; font-size:0.85rem; border:1px solid #e2e8f0; display:inline-block">{}</span>')
+
+def dedup_spans(spans: tuple) -> tuple:
+    """
+    Drop spans overlapping an earlier kept one. `spans` are (start, end, ...)
+    tuples sorted by start.
+    """
+    kept = []
+    last_end = 0
+    for span in spans:
+        if span[0] >= last_end:
+            kept.append(span)
+            last_end = span[1]
+    return tuple(kept)
+
+@lru_cache(maxsize=1024)
+def _span_prefix(cls: str, message: str) -> str:
+    # Opening tag of a highlight span. Messages repeat a lot (every occurrence
+    # of the same misspelling), so each escaped tag is only built once.
+    return f"<span class='{cls}' title='{html.escape(message, quote=True)}'>"
+
+@st.cache_data
+def build_annotated_html(text: str, errors_tuple: tuple) -> str:
+    """
+    `text` as HTML with each error wrapped in a highlight span. `errors_tuple` holds
+    non-overlapping (start, end, error_type, message) sorted by start (see dedup_spans);
+    it is hashable so that, with the text, it keys the cache and reruns that change
+    neither skip the rebuild.
+    """
+    # Build from chunks LEFT to RIGHT, escaping the plain text between errors.
+    # Exactly one (possibly empty) text chunk before each error, the error's span
+    # and the trailing text: 2E+1 parts, so size the list once up front.
+    final_html_parts = [""] * (2 * len(errors_tuple) + 1)
+    last_idx = 0
+    i = 0
+    
+    for start, end, error_type, message in errors_tuple:
+        # Text before this error
+        final_html_parts[i] = html.escape(text[last_idx:start], quote=True)
+        
+        # Text inside error
+        cls = HIGHLIGHT_CLS.get(error_type, "error-highlight")
+        
+        segment = text[start:end]
+        final_html_parts[i + 1] = _span_prefix(cls, message) + html.escape(segment, quote=True) + "</span>"
+        
+        last_idx = end
+        i += 2
+        
+    # Remaining text
+    final_html_parts[i] = html.escape(text[last_idx:], quote=True)
+        
+    return "".join(final_html_parts)
+
+def _readability_color(score: float) -> str:
+    if score > 70: return "green"
+    if score > 50: return "orange"
+    return "red"
+
+@st.cache_data
+def readability_html(score: int, color: str) -> str:
+    """
+    Readability card for an (integer) score; only a handful of distinct cards exist.
+    """
+    return f"""
+        <div style="background:white; padding:15px; border-radius:8px; border:1px solid #eee; margin-bottom:20px; display:flex; justify-content:space-between; align-items:center;">
+            <span style="font-weight:600; color:#555">Readability Score</span>
+            <span style="font-weight:700; font-size:1.2rem; color:{color}">{score}</span>
+        </div>
+        """
+
+def bucket_errors(errors) -> dict:
+    """
+    Errors per suggestions tab, sorted into buckets in a single pass.
+    """
+    buckets = {"all": list(errors), "grammar": [], "spelling": [], "style": []}
+    for e in errors:
+        if e.error_type in _GRAMMAR_TYPES: buckets["grammar"].append(e)
+        elif e.error_type == ErrorType.SPELLING: buckets["spelling"].append(e)
+        elif e.error_type == ErrorType.STYLE: buckets["style"].append(e)
+    return buckets
+
 # Header
 col1, col2 = st.columns([0.8, 0.2])
 with col1:
@@ -163,26 +288,51 @@ with left_col:
         suffix = current[err.end_index:]
         new_text = prefix + replacement + suffix
         st.session_state.input_text = new_text
-        st.session_state.input_text = new_text
         st.session_state.trigger_analysis = False
-        # Clear results as they are now stale
-        if "analysis_results" in st.session_state:
-            del st.session_state.analysis_results
+        # Results are now stale, but keep showing them (flagged) rather than
+        # forcing a re-analysis, so several fixes can be applied in a row.
+        st.session_state._results_stale = True
 
     # Process Analysis Trigger
     if analyze_btn or st.session_state.get('trigger_analysis', False):
         # Reset trigger immediately
         st.session_state.trigger_analysis = False
         
-        with st.spinner("Analyzing..."):
-            st.session_state.input_text = text_input
-            response = pipeline.analyze(text_input, use_llm=st.session_state.use_llm)
-            st.session_state.analysis_results = response
+        st.session_state.input_text = text_input
+        st.session_state.analysis_text = text_input
+        st.session_state.analysis_future = _executor().submit(
+            cached_analyze, text_input, st.session_state.use_llm
+        )
+
+    # Collect a finished background analysis
+    future = st.session_state.get("analysis_future")
+    if future is not None:
+        if future.done():
+            st.session_state.analysis_future = None
+            response = future.result()
+            analyzed_text = st.session_state.analysis_text
+            # Keep only what the views below render, not the whole response.
+            # Overlaps shouldn't survive the pipeline's conflict resolution, but
+            # are dropped here as a safe guard before they reach the HTML builder.
+            errors_tuple = dedup_spans(tuple(
+                (e.start_index, e.end_index, e.error_type, e.message)
+                # Already in start order from the pipeline's conflict resolution;
+                # sorting it again is a single O(n) Timsort pass, kept as a guard.
+                for e in sorted(response.errors, key=attrgetter("start_index"))
+            ))
+            st.session_state.annotated_html = build_annotated_html(analyzed_text, errors_tuple)
+            st.session_state.errors_by_tab = bucket_errors(response.errors)
+            st.session_state.readability_score = response.readability.flesch_reading_ease
+            st.session_state._results_stale = False
+        else:
+            st.info("Analyzing…")
 
     # Output View for Annotated Text
-    if "analysis_results" in st.session_state:
+    if "annotated_html" in st.session_state:
         st.divider()
         st.subheader("Annotated View")
+        if st.session_state.get("_results_stale"):
+            st.warning("Results may be stale — re-run Analyze")
         
         # ... (Annotated view code remains mostly same, just updating rendering logic if needed, but diff is constrained)
         # We need to preserve the annotated view logic but I can't overwrite it all easily.
@@ -199,84 +349,8 @@ with left_col:
         # Streamlit's annotated_text component is good, but let's manual build HTML for control or use generic logic
         # For simplicity, we just list the errors for now in the sidebar, or attempt a highlight render.
         
-        # Simple HTML reconstruction
-        results = st.session_state.analysis_results
-        original = text_input
-        
-        # Sort errors reverse to inject tags
-        errors = sorted(results.errors, key=lambda x: x.start_index, reverse=True)
-        
-        annotated_html = original
-        
-        # Offset tracking is tricky when inserting tags. 
-        # We sort by start index DESC so we insert from end to beginning, preventing index shifts.
-        errors = sorted(results.errors, key=lambda x: x.start_index, reverse=True)
-        
-        for e in errors:
-            start = e.start_index
-            end = e.end_index
-            
-            # Ensure valid indices
-            if start < 0 or end > len(original): continue
-            
-            cls = "error-highlight"
-            if e.error_type == ErrorType.SPELLING: cls += " spelling-err"
-            elif e.error_type == ErrorType.GRAMMAR or e.error_type == ErrorType.AGREEMENT: cls += " grammar-err"
-            elif e.error_type == ErrorType.STYLE: cls += " style-err"
-            
-            segment = original[start:end]
-            # Escape HTML in segment? Streamlit might handle it, but safer:
-            import html
-            segment_safe = html.escape(segment)
-            tooltip = html.escape(e.message)
-            
-            replacement = f"<span class='{cls}' title='{tooltip}'>{segment_safe}</span>"
-            
-            # String splicing
-            annotated_html = annotated_html[:start] + replacement + annotated_html[end:]
-        
-        # Finally, escape the non-highlighted parts? No, because now the whole string is mixed.
-        # Wait: if we reconstruct from right to left, we are splicing HTML into raw text.
-        # The raw text parts need to be escaped later? No, that's hard.
-        # Better: Build from chunks LEFT to RIGHT.
-        
-        final_html_parts = []
-        last_idx = 0
-        import html
-        
-        # Re-sort ASC for left-to-right build
-        errors = sorted(results.errors, key=lambda x: x.start_index)
-        
-        for e in errors:
-            start = e.start_index
-            end = e.end_index
-            
-            # Handle non-overlapping text before this error
-            if start > last_idx:
-                final_html_parts.append(html.escape(original[last_idx:start]))
-            
-            # Text inside error
-            # Check for overlaps? simple pipeline supposed to dedup.
-            if start < last_idx: 
-                # Overlap detected (shouldn't happen with pipeline logic, but safe guard)
-                continue
-                
-            cls = "error-highlight"
-            if e.error_type == ErrorType.SPELLING: cls += " spelling-err"
-            elif e.error_type == ErrorType.GRAMMAR or e.error_type == ErrorType.AGREEMENT: cls += " grammar-err"
-            elif e.error_type == ErrorType.STYLE: cls += " style-err"
-            
-            segment = original[start:end]
-            tooltip = html.escape(e.message)
-            final_html_parts.append(f"<span class='{cls}' title='{tooltip}'>{html.escape(segment)}</span>")
-            
-            last_idx = end
-            
-        # Remaining text
-        if last_idx < len(original):
-            final_html_parts.append(html.escape(original[last_idx:]))
-            
-        formatted_html = "".join(final_html_parts)
+        # Simple HTML reconstruction (built at analysis time, see build_annotated_html)
+        formatted_html = st.session_state.annotated_html
         
         st.markdown(f"<div class='document-view'>{formatted_html}</div>", unsafe_allow_html=True)
 
@@ -284,67 +358,62 @@ with left_col:
 with right_col:
     st.subheader("Suggestions")
     
-    if "analysis_results" in st.session_state:
-        res = st.session_state.analysis_results
-        
+    if "annotated_html" in st.session_state:
         # Readability Score
-        score = res.readability.flesch_reading_ease
-        color = "red"
-        if score > 50: color = "orange"
-        if score > 70: color = "green"
+        score = st.session_state.readability_score
+        # The color comes from the unrounded score, so e.g. 50.4 stays orange.
+        st.markdown(readability_html(int(score), _readability_color(score)), unsafe_allow_html=True)
         
-        st.markdown(f"""
-        <div style="background:white; padding:15px; border-radius:8px; border:1px solid #eee; margin-bottom:20px; display:flex; justify-content:space-between; align-items:center;">
-            <span style="font-weight:600; color:#555">Readability Score</span>
-            <span style="font-weight:700; font-size:1.2rem; color:{color}">{int(score)}</span>
-        </div>
-        """, unsafe_allow_html=True)
-        
-        # Filter Tabs
-        # Streamlit tabs
-        tab_all, tab_grammar, tab_spelling, tab_style = st.tabs(["All", "Grammar", "Spelling", "Style"])
+        # Filter
+        # A radio rather than st.tabs: tabs render every tab's content and only
+        # hide the inactive ones, so all four lists were built on each rerun.
+        choice = st.radio(
+            "Filter", ["All", "Grammar", "Spelling", "Style"],
+            horizontal=True, label_visibility="collapsed", key="error_filter"
+        )
         
         def render_errors(error_list, key_prefix="default"):
             if not error_list:
                 st.info("No issues found.")
                 return
 
+            # All cards go out in one st.markdown: every call is a separate
+            # markdown parse + mount on the frontend.
+            # (Unindented HTML: st.markdown dedents, and indented lines in a
+            # joined string would turn into a code block.)
+            parts = []
             for i, err in enumerate(error_list):
                 # Determine badge style
-                badge_cls = "bg-grammar"
-                if err.error_type == ErrorType.SPELLING: badge_cls = "bg-spelling"
-                elif err.error_type == ErrorType.STYLE: badge_cls = "bg-style"
+                badge_cls = BADGE_CLS.get(err.error_type, "bg-grammar")
+                
+                # Messages are escaped since one stray tag would now break every card.
+                parts.append(
+                    '<div class="suggestion-card">'
+                    '<div style="display:flex; justify-content:space-between; margin-bottom:8px">'
+                    f'<span class="st-badge {badge_cls}">{err.error_type.value}</span>'
+                    f'<span style="font-size:0.8rem; color:#aaa">Conf: {int(err.confidence*100)}%</span>'
+                    '</div>'
+                    f'<div style="margin-bottom:10px; font-size:0.95rem">{html.escape(err.message)}</div>'
+                    '</div>'
+                )
                 
-                with st.container():
-                    st.markdown(f"""
-                    <div class="suggestion-card">
-                        <div style="display:flex; justify-content:space-between; margin-bottom:8px">
-                            <span class="st-badge {badge_cls}">{err.error_type}</span>
-                            <span style="font-size:0.8rem; color:#aaa">Conf: {int(err.confidence*100)}%</span>
-                        </div>
-                        <div style="margin-bottom:10px; font-size:0.95rem">{err.message}</div>
-                    </div>
-                    """, unsafe_allow_html=True)
-                    
-                    if err.suggestions:
-                        # Display suggestions as non-clickable badges
-                        suggs_html = "".join([
-                            f'<span style="background:#f1f5f9; color:#334155; padding:4px 8px; border-radius:4px; margin-right:6px; font-size:0.85rem; border:1px solid #e2e8f0; display:inline-block">{s}</span>' 
-                            for s in err.suggestions[:3]
-                        ])
-                        st.markdown(f"<div style='margin-top:8px'>{suggs_html}</div>", unsafe_allow_html=True)
-
-        # Filter logic
-        errors = res.errors
+                if err.suggestions:
+                    # Display suggestions as non-clickable badges
+                    suggs_html = "".join(_SUGG_TPL.format(html.escape(s)) for s in err.suggestions[:3])
+                    parts.append(f"<div style='margin-top:8px'>{suggs_html}</div>")
+
+            st.markdown("".join(parts), unsafe_allow_html=True)
+
+        # Filter logic (bucketed at analysis time, see bucket_errors)
+        buckets = st.session_state.errors_by_tab
         
-        with tab_all:
-            render_errors(errors, "all")
-        with tab_grammar:
-            render_errors([e for e in errors if e.error_type in [ErrorType.GRAMMAR, ErrorType.AGREEMENT, ErrorType.PUNCTUATION]], "grammar")
-        with tab_spelling:
-            render_errors([e for e in errors if e.error_type == ErrorType.SPELLING], "spelling")
-        with tab_style:
-            render_errors([e for e in errors if e.error_type == ErrorType.STYLE], "style")
+        render_errors(buckets[choice.lower()], choice.lower())
 
     else:
         st.info("Hit 'Analyze' to see suggestions here.")
+
+# Poll a running analysis only after the whole page has rendered, so the
+# previous results stay visible meanwhile.
+if st.session_state.get("analysis_future") is not None:
+    time.sleep(ANALYSIS_POLL_SECONDS)
+    st.rerun()